@@ -1,6 +1,10 @@
+from collections import deque
+from itertools import islice
 from dataclasses import dataclass
 from pathlib import Path
-from time import sleep, time
+from queue import Queue
+import struct
+from threading import Thread
 import zlib
 import rp2040_flashtool.type_hints as type_hints
 from rp2040_flashtool.util import load_file, pad_len, BlInfo
@@ -10,152 +14,335 @@ from serial.tools.list_ports import comports
 import typer
 
 app = typer.Typer(context_settings={"help_option_names": ["-h", "--help"]})
+state = {"verbose": False}
 
-baudrate = 115200
+# Ignored by USB serial, real UARTs on the RP2040 can go well past this
+baudrate = 1_000_000
+# Maximum number of commands sent to the RP2040 without waiting on a
+# response over USB serial. The bootloader handles commands one at a time
+# and doesn't read the port while it programs or erases flash. Over USB
+# that is fine, once the CDC buffer is full the device NAKs and the host
+# holds on to the rest. A hardware UART only has its 32 byte RX FIFO, so
+# anything past that would be lost and commands are sent one at a time
+# there instead, see _pipeline_depth().
+pipeline_depth = 4
+# Raspberry Pi's USB vendor ID, used by the bootloader's USB serial
+_RPI_VID = 0x2e8a
 
-def _serial(port: str):
-    return Serial(port, baudrate=baudrate, timeout=1, write_timeout=1)
+# Little endian command arguments
+_U32 = struct.Struct("<I")
+_ARG2 = struct.Struct("<II")
+_SEAL_ARGS = struct.Struct("<II4s")
+_WRIT_HDR = struct.Struct("<4sII")
+
+@app.callback()
+def main(verbose: type_hints.verbose = False):
+    state["verbose"] = verbose
+
+def _progress(length: int, label: str):
+    # Per chunk messages are printed instead in verbose mode, the
+    # progress bar only redraws at a throttled rate
+    return typer.progressbar(
+        length=length, label=label, hidden=state["verbose"])
+
+def _serial(port: str, baud: int = baudrate, timeout: float = 1):
+    ser = Serial(port, baudrate=baud, timeout=timeout, write_timeout=1)
+    if hasattr(ser, "set_buffer_size"):
+        # Windows only, the default driver buffers are small enough to
+        # overrun at high baud rates
+        ser.set_buffer_size(rx_size=1 << 20, tx_size=1 << 20)
+    return ser
+
+def _try_sync(port: str, baud: int):
+    """Returns None if port answered SYNC, otherwise why it didn't.
+
+    Runs on a probe thread, so it doesn't print anything itself. A probe
+    that loses to another port would otherwise print into whatever the
+    command is doing by then.
+    """
+    try:
+        with _serial(port, baud, timeout=0.2) as ser:
+            ser.reset_input_buffer()
+            ser.write(b"SYNC")
+            # Returns as soon as the response arrives
+            resp = ser.read_until(b"SYNCPICO", size=8)
+    except Exception as err:
+        return f"Failed to connect to {port}\n{err}"
+    if not resp.endswith(b"SYNCPICO"):
+        return f"Unexpected response from {port}: {resp}"
+    return None
 
 @app.command()
-def sync(port: type_hints.port = None):
+def sync(
+        port: type_hints.port = None,
+        baud: type_hints.baud = baudrate):
     print("Synchronizing with RP2040...")
-    attempts = 5
     if port is not None:
         ports = [port]
     else:
         ports = [p.name for p in comports()]
+    # Try every port at once so the scan takes one timeout no matter how
+    # many ports there are, the first one to respond wins.
+    # Opening a port can't be interrupted, so the probes run on daemon
+    # threads, that way one that is slow to open neither holds up the
+    # return nor keeps the process alive after the command is done
+    results = Queue()
     for p in ports:
         print(f"Trying to sync with port {p}")
-        for idx in range(attempts):
-            print(f"Attempt {idx + 1}")
-            try:
-                with _serial(p) as ser:
-                    ser.write(b"SYNC")
-                    sleep(0.1)
-                    resp = ser.read_all()
-                print(resp)
-            except Exception as err:
-                print(f"Failed to connect to {p}")
-                print(err)
-                continue
-            if resp == b"SYNCPICO":
-                print(f"Synchronized with port {p}")
-                return p
+        Thread(
+            target=lambda p=p: results.put((p, _try_sync(p, baud))),
+            daemon=True).start()
+    errors = []
+    for _ in ports:
+        p, err = results.get()
+        if err is None:
+            print(f"Synchronized with port {p}")
+            return p
+        errors.append(err)
+    for err in errors:
+        print(err)
     print("Could not find an RP2040 in bootloader mode")
     exit(1)
 
+def _send(
+        ser: Serial,
+        cmd: bytes = b"",
+        args: bytes = b"",
+        raw: bytes = None):
+    # Everything goes out in a single write so the command isn't split
+    # across multiple USB transfers, callers that already have the full
+    # command in one buffer can pass it as raw to skip the concatenation
+    if raw is None:
+        raw = cmd + args
+    ser.write(raw)
+    return len(raw)
+
+def _recv(
+        ser: Serial,
+        cmd_len: int,
+        timeout: float = 1,
+        resp_size: int = 0):
+    total_len = cmd_len + 4 + resp_size
+    # The full response length is known up front, so a single blocking
+    # read returns as soon as it arrives without polling.
+    # pyserial's readinto() is implemented on top of read(), so it would
+    # only add a copy here.
+    if ser.timeout != timeout:
+        ser.timeout = timeout
+    resp = ser.read(total_len)
+    if len(resp) != total_len or resp[cmd_len:cmd_len + 4] != b"OKOK":
+        print("Error reading response from RP2040")
+        print(resp)
+        raise ValueError
+    data = resp[cmd_len + 4:]
+    return data
+
 def send_cmd(
-        port: str, 
+        ser: Serial, 
         cmd: bytes, 
         args: bytes = b"", 
         timeout: float = 1,
         resp_size: int = 0):
-    with _serial(port) as ser:
-        ser.write(cmd)
-        if args:
-            ser.write(args)
-        cmd_len = len(cmd) + len(args)
-        total_len = cmd_len + 4 + resp_size
-        resp = b""
-        start = time()
-        while time() - start < timeout:
-            resp += ser.read_all()
-            if resp[cmd_len:cmd_len + 4] == b"OKOK" and len(resp) >= total_len:
-                break
-        else:
-            print("Error reading response from RP2040")
-            print(resp)
-            raise ValueError
-        data = resp[cmd_len + 4:]
-        return data
+    # Drop anything left over from a previous command, this used to be
+    # handled by reopening the port for every command
+    ser.reset_input_buffer()
+    cmd_len = _send(ser, cmd, args)
+    return _recv(ser, cmd_len, timeout, resp_size)
 
-@app.command()
-def info(port: type_hints.port = None):
+def _pipeline(
+        ser: Serial,
+        chunks: list,
+        send,
+        recv,
+        attempts: int = 3,
+        depth: int = pipeline_depth):
+    """Run send/recv for each chunk in order, keeping up to depth chunks in
+    flight so the host and RP2040 are never waiting on each other.
+
+    Since every chunk is at most max_data_len bytes this also caps the
+    outstanding data at max_data_len * depth.
+    On failure all in flight responses are drained and the pipeline is
+    restarted from the failed chunk.
+    """
+    in_flight = deque()
+    idx = 0
+    done = 0
+    failures = 0
+    while done < len(chunks):
+        while idx < len(chunks) and len(in_flight) < depth:
+            in_flight.append((chunks[idx], send(ser, *chunks[idx])))
+            idx += 1
+        chunk, cmd_len = in_flight.popleft()
+        try:
+            result = recv(ser, cmd_len, *chunk)
+        except ValueError:
+            failures += 1
+            if failures >= attempts:
+                raise
+            while in_flight:
+                chunk, cmd_len = in_flight.popleft()
+                try:
+                    recv(ser, cmd_len, *chunk)
+                except ValueError:
+                    pass
+            ser.reset_input_buffer()
+            idx = done
+            continue
+        failures = 0
+        done += 1
+        yield result
+
+def _pipeline_depth(port: str):
+    """How many commands can be in flight on port, pipeline_depth for the
+    RP2040's own USB serial and 1 for anything else.
+
+    USB to UART adapters show up with their own vendor ID, so they are
+    treated as the hardware UART they are wired to.
+    """
+    for p in comports():
+        if port in (p.name, p.device):
+            return pipeline_depth if p.vid == _RPI_VID else 1
+    return 1
+
+def _info(ser: Serial):
     attempts = 3
-    port = sync(port)
-    print(f"Getting device info from port {port}")
+    print(f"Getting device info from port {ser.port}")
     for _ in range(attempts):
-        data = send_cmd(port, b"INFO", resp_size=24)
-        bl_info = BlInfo.from_bytes(data)
+        try:
+            data = send_cmd(ser, b"INFO", resp_size=24)
+            bl_info = BlInfo.from_bytes(data)
+        except (ValueError, SerialException) as err:
+            print(f"INFO attempt failed: {err!r}")
+            continue
         print(bl_info)
         break
     else:
-        print(f"Failed to get info from port {port}")
+        print(f"Failed to get info from port {ser.port}")
         exit(1)
+    return bl_info
+
+@app.command()
+def info(
+        port: type_hints.port = None,
+        baud: type_hints.baud = baudrate):
+    port = sync(port, baud)
+    with _serial(port, baud) as ser:
+        bl_info = _info(ser)
     return port, bl_info
 
-def _read(port: str, addr: int, size: int):
-    print(f"Reading {hex(size)} bytes from {hex(addr)}")
-    args = (
-        addr.to_bytes(length=4, byteorder="little") +
-        size.to_bytes(length=4, byteorder="little")
-    )
-    data = send_cmd(port, b"READ", args, resp_size=size)
+def _send_read(ser: Serial, addr: int, size: int):
+    if state["verbose"]:
+        print(f"Reading {hex(size)} bytes from {hex(addr)}")
+    args = _ARG2.pack(addr, size)
+    _send(ser, b"READ", args)
+    return _send(ser, b"CRCC", args)
+
+def _recv_read(ser: Serial, cmd_len: int, addr: int, size: int):
+    data = _recv(ser, cmd_len, resp_size=size)
+    crc = _recv(ser, cmd_len, resp_size=4)
     if len(data) != size:
         print("RP2040 did not return correct number of bytes")
         print(data)
         raise ValueError
-    expected_crc = zlib.crc32(data).to_bytes(length=4, byteorder="little")
-    crc = send_cmd(port, b"CRCC", args, resp_size=4)
+    expected_crc = _U32.pack(zlib.crc32(data))
     if expected_crc != crc:
         print(f"Error: CRC mismatch, expected {expected_crc}, got {crc}")
         raise ValueError
     return data
 
+def _read_batch(ser: Serial, addr: int, length: int, chunk: int):
+    """Send a READ and a CRCC for every chunk of the range back to back,
+    then collect all of the responses with a single read.
+
+    Each CRCC covers the same range as the READ before it, nothing shows
+    the bootloader accepts CRCC ranges longer than max_data_len.
+
+    Returns None if any response is missing or a CRC does not match.
+    """
+    chunks = [
+        (addr + idx, min(chunk, length - idx))
+        for idx in range(0, length, chunk)
+    ]
+    for a, size in chunks:
+        cmd_len = _send_read(ser, a, size)
+    total_len = len(chunks) * 2 * (cmd_len + 4) + length + len(chunks) * 4
+    if ser.timeout != 10:
+        ser.timeout = 10
+    resp = ser.read(total_len)
+    if len(resp) != total_len:
+        print("Error reading response from RP2040")
+        return None
+    data = []
+    pos = 0
+    for _, size in chunks:
+        pos += cmd_len
+        if resp[pos:pos + 4] != b"OKOK":
+            print("Error reading response from RP2040")
+            return None
+        pos += 4
+        data.append(resp[pos:pos + size])
+        pos += size + cmd_len
+        expected_crc = _U32.pack(zlib.crc32(data[-1]))
+        crc = resp[pos + 4:pos + 8]
+        if resp[pos:pos + 4] != b"OKOK" or expected_crc != crc:
+            print(f"Error: CRC mismatch, expected {expected_crc}, got {crc}")
+            return None
+        pos += 8
+    return b"".join(data)
+
 @app.command()
 def read(
         port: type_hints.port = None,
         out_file: type_hints.out_file = "out.bin",
         addr: type_hints.addr = None,
-        length: type_hints.length = None):
-    port, bl_info = info(port)
-    if addr is None:
-        addr = bl_info.flash_start
-    if length is None:
-        length = bl_info.flash_end - addr
-    attempts = 3
-    print(f"Downloading image from port {port} to {out_file}")
-    print(
-        f"Start address: {hex(addr)}\n"
-        f"End address: {hex(addr + length)}\n"
-        f"Length: {hex(length)}"
-    )
-    idx = 0
-    with open(out_file, "wb") as f:
-        while idx < length:
-            read_size = min(bl_info.max_data_len, length - idx)
-            for _ in range(attempts):
-                try:
-                    f.write(_read(port, addr + idx, read_size))
-                    break
-                except ValueError:
-                    pass
-            else:
-                raise
-            idx += read_size
+        length: type_hints.length = None,
+        baud: type_hints.baud = baudrate):
+    port = sync(port, baud)
+    with _serial(port, baud) as ser:
+        bl_info = _info(ser)
+        if addr is None:
+            addr = bl_info.flash_start
+        if length is None:
+            length = bl_info.flash_end - addr
+        print(f"Downloading image from port {port} to {out_file}")
+        print(
+            f"Start address: {hex(addr)}\n"
+            f"End address: {hex(addr + length)}\n"
+            f"Length: {hex(length)}"
+        )
+        chunk = bl_info.max_data_len
+        # Each chunk is a READ and a CRCC. A lone pair is only 24 bytes so
+        # it always fits in a UART's RX FIFO
+        chunks_per_batch = max(_pipeline_depth(port) // 2, 1)
+        batch_len = chunk * chunks_per_batch
+        # A large buffer collapses the per batch writes into a few syscalls
+        f = open(out_file, "wb", buffering=1 << 20)
+        with f, _progress(length, "Reading") as progress:
+            for idx in range(0, length, batch_len):
+                read_len = min(batch_len, length - idx)
+                data = _read_batch(ser, addr + idx, read_len, chunk)
+                if data is None:
+                    print("Retrying batch one chunk at a time")
+                    ser.reset_input_buffer()
+                    chunks = [
+                        (addr + idx + offset, min(chunk, read_len - offset))
+                        for offset in range(0, read_len, chunk)
+                    ]
+                    data = b"".join(_pipeline(
+                        ser, chunks, _send_read, _recv_read,
+                        depth=chunks_per_batch))
+                f.write(data)
+                progress.update(read_len)
 
-def _erase(port: str, addr: int, size: int):
-    print(f"Erasing {hex(size)} bytes from {hex(addr)}")
-    args = (
-        addr.to_bytes(length=4, byteorder="little") +
-        size.to_bytes(length=4, byteorder="little")
-    )
-    send_cmd(port, b"ERAS", args, timeout=10)
+def _erase(ser: Serial, addr: int, size: int):
+    if state["verbose"]:
+        print(f"Erasing {hex(size)} bytes from {hex(addr)}")
+    args = _ARG2.pack(addr, size)
+    send_cmd(ser, b"ERAS", args, timeout=10)
 
-@app.command()
-def erase(
-        port: type_hints.port = None,
-        addr: type_hints.addr = None,
-        length: type_hints.length = None,
-        bl_info: type_hints.bl_info = None):
-    if port is None or bl_info is None:
-        port, bl_info = info(port)
-    if addr is None:
-        addr = bl_info.erase_start
-    if length is None:
-        length = bl_info.flash_end - addr
+def _erase_range(ser: Serial, addr: int, length: int, bl_info: BlInfo):
     attempts = 3
-    print(f"Erasing data from port {port}")
+    print(f"Erasing data from port {ser.port}")
     print(
         f"Start address: {hex(addr)}\n"
         f"End address: {hex(addr + length)}\n"
@@ -170,7 +357,7 @@ def erase(
         erase_size = min(0xfffff000, length - idx)
         for _ in range(attempts):
             try:
-                _erase(port, addr + idx, erase_size)
+                _erase(ser, addr + idx, erase_size)
                 break
             except ValueError:
                 pass
@@ -178,31 +365,71 @@ def erase(
             raise
         idx += erase_size
 
-def _write(port: str, addr: int, data: bytes):
+@app.command()
+def erase(
+        port: type_hints.port = None,
+        addr: type_hints.addr = None,
+        length: type_hints.length = None,
+        baud: type_hints.baud = baudrate):
+    port = sync(port, baud)
+    with _serial(port, baud) as ser:
+        bl_info = _info(ser)
+        if addr is None:
+            addr = bl_info.erase_start
+        if length is None:
+            length = bl_info.flash_end - addr
+        _erase_range(ser, addr, length, bl_info)
+
+def _send_write(ser: Serial, addr: int, data: bytes, chunk_crc: int = None):
     size = len(data)
-    print(f"Writing {hex(size)} bytes to {hex(addr)}")
-    args = (
-        addr.to_bytes(length=4, byteorder="little") +
-        size.to_bytes(length=4, byteorder="little") +
-        data
-    )
-    crc = send_cmd(port, b"WRIT", args, timeout=10, resp_size=4)
-    expected_crc = zlib.crc32(data).to_bytes(length=4, byteorder="little")
+    if state["verbose"]:
+        print(f"Writing {hex(size)} bytes to {hex(addr)}")
+    raw = bytearray(_WRIT_HDR.size + size)
+    _WRIT_HDR.pack_into(raw, 0, b"WRIT", addr, size)
+    raw[_WRIT_HDR.size:] = data
+    return _send(ser, raw=raw)
+
+def _recv_write(
+        ser: Serial, cmd_len: int, addr: int, data: bytes, chunk_crc: int):
+    crc = _recv(ser, cmd_len, timeout=10, resp_size=4)
+    expected_crc = _U32.pack(chunk_crc)
     if expected_crc != crc:
         print(f"Error: CRC mismatch, expected {expected_crc}, got {crc}")
         raise ValueError
 
-@app.command()
-def write(
-        in_file: type_hints.in_file,
-        port: type_hints.port = None,
-        addr: type_hints.flash_addr = None,
-        bl_info: type_hints.bl_info = None):
-    if port is None or bl_info is None:
-        port, bl_info = info(port)
-    print(f"Uploading image {in_file} to port {port}")
-    addr, data = load_file(in_file, bl_info, addr)
-    length = len(data)
+def _write_batch(ser: Serial, chunks: list):
+    """Send a WRIT for every (addr, data, chunk_crc) chunk back to back, then
+    check all of the responses against the precomputed CRCs with a single
+    read.
+
+    Returns False if any response is missing or has the wrong CRC.
+    """
+    expected_crcs = [_U32.pack(chunk_crc) for _, _, chunk_crc in chunks]
+    cmd_lens = [_send_write(ser, *chunk) for chunk in chunks]
+    total_len = sum(cmd_len + 4 + 4 for cmd_len in cmd_lens)
+    if ser.timeout != 10:
+        ser.timeout = 10
+    resp = ser.read(total_len)
+    if len(resp) != total_len:
+        print("Error reading response from RP2040")
+        return False
+    pos = 0
+    for cmd_len, expected_crc in zip(cmd_lens, expected_crcs):
+        pos += cmd_len
+        ok = resp[pos:pos + 4]
+        crc = resp[pos + 4:pos + 8]
+        pos += 8
+        if ok != b"OKOK" or crc != expected_crc:
+            print(f"Error: CRC mismatch, expected {expected_crc}, got {crc}")
+            return False
+    return True
+
+def _write_image(
+        ser: Serial,
+        addr: int,
+        length: int,
+        chunks,
+        bl_info: BlInfo):
     print(
         f"Start address: {hex(addr)}\n"
         f"End address: {hex(addr + length)}\n"
@@ -214,51 +441,75 @@ def write(
     if addr + length > bl_info.flash_end:
         print(f"Error: end address {hex(addr + length)} is outside the writeable range")
         exit(1)
-    attempts = 3
-    idx = 0
-    while idx < length:
-        write_size = min(bl_info.max_data_len, length - idx)
-        for _ in range(attempts):
-            try:
-                _write(port, addr + idx, data[idx:idx + write_size])
-                break
-            except ValueError:
-                pass
-        else:
-            raise
-        idx += write_size
+    # CRC of the whole image, accumulated as it is written so it doesn't
+    # need to be computed again for sealing
+    crc = 0
+    depth = _pipeline_depth(ser.port)
+    chunks = iter(chunks)
+    with _progress(length, "Writing") as progress:
+        while batch := [
+                (addr + offset, data, zlib.crc32(data))
+                for offset, data in islice(chunks, depth)]:
+            # Chunk CRCs check the WRIT responses, including on the retry
+            # path, the chained image CRC is used for sealing
+            for _, data, _ in batch:
+                crc = zlib.crc32(data, crc)
+            if not _write_batch(ser, batch):
+                print("Retrying batch one chunk at a time")
+                ser.reset_input_buffer()
+                for _ in _pipeline(
+                        ser, batch, _send_write, _recv_write, depth=depth):
+                    pass
+            progress.update(sum(len(data) for _, data, _ in batch))
+    return crc
 
-def _seal(port: str, addr: int, length: int, crc: bytes):
-    args = (
-        addr.to_bytes(length=4, byteorder="little") +
-        length.to_bytes(length=4, byteorder="little") +
-        crc
-    )
-    send_cmd(port, b"SEAL", args)
+@app.command()
+def write(
+        in_file: type_hints.in_file,
+        port: type_hints.port = None,
+        addr: type_hints.flash_addr = None,
+        baud: type_hints.baud = baudrate):
+    port = sync(port, baud)
+    with _serial(port, baud) as ser:
+        bl_info = _info(ser)
+        print(f"Uploading image {in_file} to port {port}")
+        addr, length, chunks = load_file(in_file, bl_info, addr)
+        _write_image(ser, addr, length, chunks, bl_info)
+
+def _seal(ser: Serial, addr: int, length: int, crc: bytes):
+    args = _SEAL_ARGS.pack(addr, length, crc)
+    send_cmd(ser, b"SEAL", args)
 
 @app.command()
 def flash(
         in_file: type_hints.in_file,
         port: type_hints.port = None,
         addr: type_hints.flash_addr = None,
-        should_boot: type_hints.boot = False):
-    port, bl_info = info(port)
-    addr, data = load_file(in_file, bl_info, addr)
-    erase_pad_length = pad_len(len(data), bl_info.erase_size)
-    print(f"Need to pad erase by {hex(erase_pad_length)}")
-    erase(port, addr, len(data) + erase_pad_length, bl_info)
-    write(in_file, port, addr, bl_info)
-    crc = zlib.crc32(data)
-    print(f"Sealing RP2040 with CRC {hex(crc)}")
-    crc = crc.to_bytes(length=4, byteorder="little")
-    _seal(port, addr, len(data), crc)
-    if should_boot:
-        boot(port, addr, bl_info)
-
-def _go(port: str, addr: int):
-    args = addr.to_bytes(length=4, byteorder="little")
+        should_boot: type_hints.boot = False,
+        baud: type_hints.baud = baudrate):
+    port = sync(port, baud)
+    with _serial(port, baud) as ser:
+        bl_info = _info(ser)
+        addr, length, chunks = load_file(in_file, bl_info, addr)
+        erase_pad_length = pad_len(length, bl_info.erase_size)
+        print(f"Need to pad erase by {hex(erase_pad_length)}")
+        # The bootloader can't take commands while it erases, so there is
+        # nothing to overlap the erase with. A single ERAS over the whole
+        # range also lets flash_range_erase() use 64k block erases
+        _erase_range(ser, addr, length + erase_pad_length, bl_info)
+        print(f"Uploading image {in_file} to port {port}")
+        crc = _write_image(ser, addr, length, chunks, bl_info)
+        print(f"Sealing RP2040 with CRC {hex(crc)}")
+        crc = _U32.pack(crc)
+        _seal(ser, addr, length, crc)
+        if should_boot:
+            print(f"Jumping to {hex(addr)}")
+            _go(ser, addr)
+
+def _go(ser: Serial, addr: int):
+    args = _U32.pack(addr)
     try:
-        send_cmd(port, b"GOGO", args)
+        send_cmd(ser, b"GOGO", args)
     except SerialException:
         # USB serial will disconnect on jump
         print("RP2040 serial disconnected")
@@ -267,11 +518,12 @@ def _go(port: str, addr: int):
 def boot(
         port: type_hints.port = None,
         addr: type_hints.boot_addr = None,
-        bl_info: type_hints.bl_info = None):
-    if port is None or bl_info is None:
-        port, bl_info = info(port)
-    print(f"Jumping to {hex(addr)}")
-    _go(port, addr)
+        baud: type_hints.baud = baudrate):
+    port = sync(port, baud)
+    with _serial(port, baud) as ser:
+        _info(ser)
+        print(f"Jumping to {hex(addr)}")
+        _go(ser, addr)
     
 
 if __name__ == "__main__":
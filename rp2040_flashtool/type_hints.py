@@ -1,7 +1,6 @@
 from typing import Optional, Any
 from typing_extensions import Annotated
 import typer
-from rp2040_flashtool.util import BlInfo
 
 def _rename(name):
     def decorator(f):
@@ -13,19 +12,16 @@ def _rename(name):
 def parse_integer(value: str | int):
     if isinstance(value, int):
         return value
+    # Base 0 picks up 0x/0o/0b prefixes, but rejects leading zeros on
+    # plain decimal numbers
     try:
-        return int(value, 10)
-    except ValueError:
-        pass
-    try:
-        return int(value, 16)
+        return int(value, 0)
     except ValueError:
         pass
     try:
-        return int(value, 2)
+        return int(value, 10)
     except ValueError:
-        pass
-    raise ValueError(f"'{value}' is not a number")
+        raise ValueError(f"'{value}' is not a number")
 
 port = Annotated[
     Optional[str], 
@@ -79,6 +75,15 @@ length = Annotated[
         parser=parse_integer,
         help="Number of bytes to read, full flash range if not specified")]
 
-bl_info = Annotated[
-    Optional[BlInfo], 
-    typer.Option(parser=lambda x: None, hidden=True)]
\ No newline at end of file
+verbose = Annotated[
+    bool, 
+    typer.Option(
+        "--verbose", "-v",
+        help="Print every chunk sent to or received from the RP2040")]
+
+baud = Annotated[
+    int, 
+    typer.Option(
+        "--baud", "-B",
+        parser=parse_integer,
+        help="Serial baud rate, ignored by USB serial")]
\ No newline at end of file
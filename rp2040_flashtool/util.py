@@ -1,7 +1,22 @@
+import os
 from pathlib import Path
 from dataclasses import dataclass
+import struct
+from bisect import bisect_left, bisect_right
+from elftools.elf.constants import SH_FLAGS
 from elftools.elf.elffile import ELFFile
 
+_BLINFO = struct.Struct("<6I")
+_BLINFO_LEN = _BLINFO.size
+_BLINFO_REPR = (
+    "Flash start:     {:#x}\n"
+    "Flash size:      {:#x}\n"
+    "Erase start:     {:#x}\n"
+    "Erase size:      {:#x}\n"
+    "Write size:      {:#x}\n"
+    "Max data length: {:#x}\n"
+)
+
 @dataclass
 class BlInfo:
     flash_start: int
@@ -21,30 +36,16 @@ class BlInfo:
 
     @classmethod
     def from_bytes(cls, data):
-        data_len = 24   
-        if len(data) != data_len:
-            print(f"Error: info response must always be {data_len} bytes long")
-            print(data)
-            exit(1)
-        flash_start = int.from_bytes(data[0:4], "little")
-        flash_size = int.from_bytes(data[4:8], "little")
-        erase_start = int.from_bytes(data[8:12], "little")
-        erase_size = int.from_bytes(data[12:16], "little")
-        write_size = int.from_bytes(data[16:20], "little")
-        max_data_len = int.from_bytes(data[20:24], "little")
-        return cls(
-            flash_start, flash_size, erase_start, 
-            erase_size, write_size, max_data_len)
+        if len(data) != _BLINFO_LEN:
+            raise ValueError(
+                f"info response must always be {_BLINFO_LEN} bytes long, "
+                f"got {data}")
+        return cls(*_BLINFO.unpack(data))
 
     def __repr__(self):
-        return (
-            f"Flash start:     {hex(self.flash_start)}\n"
-            f"Flash size:      {hex(self.flash_size)}\n"
-            f"Erase start:     {hex(self.erase_start)}\n"
-            f"Erase size:      {hex(self.erase_size)}\n"
-            f"Write size:      {hex(self.write_size)}\n"
-            f"Max data length: {hex(self.max_data_len)}\n"
-        )
+        return _BLINFO_REPR.format(
+            self.flash_start, self.flash_size, self.erase_start,
+            self.erase_size, self.write_size, self.max_data_len)
 
 # Elf code based on 
 # https://github.com/ConfedSolutions/pico-py-serial-flash/blob/main/flasher/elf.py
@@ -52,21 +53,21 @@ class BlInfo:
 def _is_in_flash(addr, size: int, bl_info: BlInfo) -> bool:
     return (addr >= bl_info.flash_start) and (addr + size <= bl_info.flash_end)
 
-def _is_in_header(vaddr, size, header):
-    return (vaddr >= header['p_vaddr']) and (vaddr + size <= (header['p_vaddr'] + header['p_memsz']))
-
-@dataclass
-class Chunk:
-    paddr: int
-    data: bytes
-
 def load_elf(file: str, bl_info: BlInfo):
-    chunks = []
+    placements = []
     with open(file, "rb") as stream:
         f = ELFFile(stream)
-        count = 0
-        for head_count in range(f.header["e_phnum"]):
-            prog_head = f.get_segment(head_count).header
+        # Sort the loadable sections by address once so each program header
+        # can find the sections inside it with a binary search
+        sections = sorted(
+            (
+                sec for sec in f.iter_sections()
+                if sec.data_size > 0 and sec.header["sh_flags"] & SH_FLAGS.SHF_ALLOC
+            ),
+            key=lambda sec: sec.header["sh_addr"])
+        sec_addrs = [sec.header["sh_addr"] for sec in sections]
+        for head_count, seg in enumerate(f.iter_segments()):
+            prog_head = seg.header
             p_paddr = prog_head["p_paddr"]
             p_memsz = prog_head["p_memsz"]
             if not _is_in_flash(p_paddr, p_memsz, bl_info):
@@ -77,56 +78,72 @@ def load_elf(file: str, bl_info: BlInfo):
                 print(f"Length: {hex(p_memsz)}")
                 continue
 
-            for sec_count in range(f.header["e_shnum"]):
-                count += 1
-                sec = f.get_section(sec_count)
-                sec_size = sec.data_size
+            p_vaddr = prog_head["p_vaddr"]
+            seg_end = p_vaddr + p_memsz
+            start = bisect_left(sec_addrs, p_vaddr)
+            end = bisect_right(sec_addrs, seg_end)
+            for sec in sections[start:end]:
                 sec_addr = sec.header["sh_addr"]
-                in_header = _is_in_header(sec_addr, sec_size, prog_head)
-                if sec_size > 0 and in_header:
-                    prog_offset = sec_addr - prog_head["p_vaddr"]
-                    data = sec.data()
-                    chunk = Chunk(paddr=p_paddr + prog_offset, data=data)
-                    chunks.append(chunk)
-    
-    chunks.sort(key=lambda x: x.paddr)
-
-    min_addr = chunks[0].paddr
-    max_addr = chunks[-1].paddr + len(chunks[-1].data)
-    img_data = bytearray(max_addr - min_addr)
-    for c in chunks:
-        start = c.paddr - min_addr
-        end = start + len(c.data)
-        img_data[start:end] = c.data
-    return min_addr, bytes(img_data)
+                if sec_addr + sec.data_size <= seg_end:
+                    prog_offset = sec_addr - p_vaddr
+                    placements.append((p_paddr + prog_offset, sec))
+
+        # The section headers are enough to size the image, so it can be
+        # allocated once and each section's data copied straight into it
+        min_addr = min(paddr for paddr, _ in placements)
+        max_addr = max(paddr + sec.data_size for paddr, sec in placements)
+        img_data = bytearray(max_addr - min_addr)
+        with memoryview(img_data) as img:
+            for paddr, sec in placements:
+                # Slice by the data actually returned, a memoryview won't
+                # resize to fit like a bytearray would
+                data = sec.data()
+                start = paddr - min_addr
+                img[start:start + len(data)] = data
+    return min_addr, img_data
 
 def pad_len(length, align):
     next_aligned = ((length + align - 1) // align) * align
     return next_aligned - length
 
+def _iter_bytes(data: bytes, chunk: int):
+    for offset in range(0, len(data), chunk):
+        yield offset, data[offset:offset + chunk]
+
+def _iter_file(file: Path, length: int, chunk: int):
+    # Stream the file from disk, zero padding the end out to length.
+    # Chunks are small so read ahead with a large buffer
+    with open(file, "rb", buffering=1 << 20) as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        for offset in range(0, length, chunk):
+            data = f.read(chunk)
+            size = min(chunk, length - offset)
+            if len(data) < size:
+                data += bytes(size - len(data))
+            yield offset, data
+
 def load_file(file: str, bl_info: BlInfo, addr: int = None):
+    """Returns the start address, padded length, and an iterator of
+    (offset, data) chunks of at most bl_info.max_data_len bytes."""
     file = Path(file)
     if file.suffix.lower() == ".elf":
         addr, data = load_elf(file, bl_info)
+        length = len(data)
     elif file.suffix.lower() == ".bin":
         if addr is None:
             print("Error: base address must be provided for a .bin file")
             exit(1)
-        with open(file, "rb") as f:
-            data = f.read()
+        length = file.stat().st_size
     else:
         print(f"Unsupported file type {file.suffix}")
         exit(1)
-    length = len(data)
     pad_length = pad_len(length, bl_info.write_size)
     if pad_length:
         print(f"Need to pad image by {hex(pad_length)}")
+    if file.suffix.lower() == ".elf":
         data += bytes(pad_length)
-    return addr, data
-
-
-
-
-        
-    
-
+        chunks = _iter_bytes(memoryview(data), bl_info.max_data_len)
+    else:
+        chunks = _iter_file(file, length + pad_length, bl_info.max_data_len)
+    return addr, length + pad_length, chunks
@@ -0,0 +1,289 @@
+import os
+import struct
+import threading
+import zlib
+
+import pytest
+from serial import SerialException
+from typer.testing import CliRunner
+
+import rp2040_flashtool.cli as cli
+
+FLASH_START = 0x10000000
+FLASH_SIZE = 0x40000
+ERASE_START = 0x10008000
+MAX_DATA_LEN = 0x400
+
+_ARG_LEN = {
+    b"INFO": 0, b"READ": 8, b"CRCC": 8, b"ERAS": 8, b"SEAL": 12, b"GOGO": 4,
+}
+
+class FakeBootloader:
+    """Answers commands like the bootloader does, by echoing each one back
+    followed by OKOK and its response.
+
+    fail maps a command to the occurrences of it (counting from 1) that
+    get ERR! instead.
+    """
+    def __init__(self, fail: dict = None):
+        self.flash = bytearray(b"\xff" * FLASH_SIZE)
+        self.fail = fail or {}
+        self.cmds = []
+        self.sealed = None
+        # Most commands ever sent without the host reading in between
+        self.max_in_flight = 0
+
+    def _mem(self, addr: int, size: int):
+        return slice(addr - FLASH_START, addr - FLASH_START + size)
+
+    def handle(self, frame: bytes):
+        cmd = frame[:4]
+        self.cmds.append(frame)
+        if self.count(cmd) in self.fail.get(cmd, ()):
+            return frame + b"ERR!"
+        resp = b"OKOK"
+        if cmd == b"INFO":
+            resp += struct.pack(
+                "<6I", FLASH_START, FLASH_SIZE, ERASE_START, 0x1000, 0x100,
+                MAX_DATA_LEN)
+        elif cmd in (b"READ", b"CRCC"):
+            addr, size = struct.unpack_from("<II", frame, 4)
+            data = self.flash[self._mem(addr, size)]
+            if cmd == b"READ":
+                resp += data
+            else:
+                resp += struct.pack("<I", zlib.crc32(data))
+        elif cmd == b"ERAS":
+            addr, size = struct.unpack_from("<II", frame, 4)
+            self.flash[self._mem(addr, size)] = b"\xff" * size
+        elif cmd == b"WRIT":
+            addr, size = struct.unpack_from("<II", frame, 4)
+            self.flash[self._mem(addr, size)] = frame[12:]
+            resp += struct.pack("<I", zlib.crc32(frame[12:]))
+        elif cmd == b"SEAL":
+            self.sealed = struct.unpack_from("<II4s", frame, 4)
+        return frame + resp
+
+    def count(self, cmd: bytes):
+        return sum(1 for frame in self.cmds if frame[:4] == cmd)
+
+class FakeSerial:
+    def __init__(self, device: FakeBootloader, port: str, timeout: float):
+        self.device = device
+        self.port = port
+        self.timeout = timeout
+        self._in = bytearray()
+        self._out = bytearray()
+        self._in_flight = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def write(self, data: bytes):
+        self._in += data
+        while len(self._in) >= 4:
+            cmd = bytes(self._in[:4])
+            if cmd == b"SYNC":
+                frame_len = 4
+            elif cmd == b"WRIT":
+                if len(self._in) < 12:
+                    break
+                frame_len = 12 + struct.unpack_from("<I", self._in, 8)[0]
+            else:
+                frame_len = 4 + _ARG_LEN[cmd]
+            if len(self._in) < frame_len:
+                break
+            frame = bytes(self._in[:frame_len])
+            del self._in[:frame_len]
+            if cmd == b"SYNC":
+                self._out += b"SYNCPICO"
+                continue
+            self._out += self.device.handle(frame)
+            self._in_flight += 1
+            self.device.max_in_flight = max(
+                self.device.max_in_flight, self._in_flight)
+        return len(data)
+
+    def read(self, size: int = 1):
+        self._in_flight = 0
+        data = bytes(self._out[:size])
+        del self._out[:size]
+        return data
+
+    def read_until(self, expected: bytes, size: int = None):
+        return self.read(size)
+
+    def reset_input_buffer(self):
+        self._out.clear()
+
+class FakePort:
+    def __init__(self, name: str, vid: int = None):
+        self.name = name
+        self.device = f"/dev/{name}"
+        self.vid = vid
+
+def _install(monkeypatch, device: FakeBootloader, vid: int = cli._RPI_VID):
+    def serial(port, baudrate, timeout, write_timeout):
+        return FakeSerial(device, port, timeout)
+    monkeypatch.setattr(cli, "Serial", serial)
+    monkeypatch.setattr(cli, "comports", lambda: [FakePort("ttyACM0", vid)])
+    return FakeSerial(device, "ttyACM0", 1)
+
+def _chunks(addr: int, data: bytes):
+    return [
+        (addr + idx, data[idx:idx + MAX_DATA_LEN],
+            zlib.crc32(data[idx:idx + MAX_DATA_LEN]))
+        for idx in range(0, len(data), MAX_DATA_LEN)
+    ]
+
+def test_write_batch(monkeypatch):
+    device = FakeBootloader()
+    ser = _install(monkeypatch, device)
+    data = os.urandom(MAX_DATA_LEN * 3 + 0x100)
+
+    assert cli._write_batch(ser, _chunks(ERASE_START, data))
+
+    assert device.count(b"WRIT") == 4
+    assert device.flash[0x8000:0x8000 + len(data)] == data
+
+def test_write_batch_error(monkeypatch):
+    device = FakeBootloader(fail={b"WRIT": [3]})
+    ser = _install(monkeypatch, device)
+    data = os.urandom(MAX_DATA_LEN * 4)
+
+    assert not cli._write_batch(ser, _chunks(ERASE_START, data))
+
+def test_read_batch(monkeypatch):
+    device = FakeBootloader()
+    ser = _install(monkeypatch, device)
+    data = os.urandom(MAX_DATA_LEN * 2 - 0x80)
+    device.flash[0x100:0x100 + len(data)] = data
+
+    assert cli._read_batch(
+        ser, FLASH_START + 0x100, len(data), MAX_DATA_LEN) == data
+
+    # Every CRCC checks exactly the READ before it
+    assert [frame[:4] for frame in device.cmds] == [b"READ", b"CRCC"] * 2
+    assert device.cmds[0][4:] == device.cmds[1][4:]
+    assert device.cmds[2][4:] == device.cmds[3][4:]
+
+@pytest.mark.parametrize("fail", [{b"READ": [2]}, {b"CRCC": [1]}])
+def test_read_batch_error(monkeypatch, fail):
+    device = FakeBootloader(fail=fail)
+    ser = _install(monkeypatch, device)
+
+    assert cli._read_batch(
+        ser, FLASH_START, MAX_DATA_LEN * 2, MAX_DATA_LEN) is None
+
+def test_pipeline_restarts_after_error(monkeypatch):
+    device = FakeBootloader(fail={b"WRIT": [2]})
+    ser = _install(monkeypatch, device)
+    data = os.urandom(MAX_DATA_LEN * 5)
+    chunks = _chunks(ERASE_START, data)
+
+    results = list(cli._pipeline(
+        ser, chunks, cli._send_write, cli._recv_write, depth=4))
+
+    assert len(results) == 5
+    # The pipeline is topped back up to depth after the first response.
+    # The chunks in flight behind the failed one are drained, then it
+    # picks back up from the failed chunk
+    addrs = [
+        struct.unpack_from("<I", frame, 4)[0] - ERASE_START
+        for frame in device.cmds
+    ]
+    assert addrs == [
+        0, 0x400, 0x800, 0xc00, 0x1000,
+        0x400, 0x800, 0xc00, 0x1000,
+    ]
+    assert device.flash[0x8000:0x8000 + len(data)] == data
+
+def _flash(
+        monkeypatch, tmp_path, device: FakeBootloader,
+        vid: int = cli._RPI_VID):
+    _install(monkeypatch, device, vid)
+    # Not a multiple of write_size or erase_size
+    data = os.urandom(0x5123)
+    file = tmp_path / "image.bin"
+    file.write_bytes(data)
+    result = CliRunner().invoke(
+        cli.app, ["flash", "-i", str(file), "-a", hex(ERASE_START)])
+    assert result.exit_code == 0, result.output
+    return data, result.output
+
+def test_flash(monkeypatch, tmp_path):
+    device = FakeBootloader()
+    data, output = _flash(monkeypatch, tmp_path, device)
+
+    image = data + bytes(0x5200 - len(data))
+    assert device.flash[0x8000:0x8000 + 0x5200] == image
+    # One ERAS over the whole padded range
+    eras = [frame for frame in device.cmds if frame[:4] == b"ERAS"]
+    assert eras == [b"ERAS" + struct.pack("<II", ERASE_START, 0x6000)]
+    assert device.flash[0x8000 + 0x5200:0x8000 + 0x6000] == (
+        b"\xff" * (0x6000 - 0x5200))
+    assert device.sealed == (
+        ERASE_START, 0x5200, struct.pack("<I", zlib.crc32(image)))
+    assert device.max_in_flight == cli.pipeline_depth
+    assert "Retrying" not in output
+
+@pytest.mark.parametrize("fail", [{b"WRIT": [6]}, {b"ERAS": [1]}])
+def test_flash_retries(monkeypatch, tmp_path, fail):
+    device = FakeBootloader(fail=fail)
+    data, output = _flash(monkeypatch, tmp_path, device)
+
+    # A failed ERAS is retried on its own, a failed WRIT retries its batch
+    assert ("Retrying batch" in output) == (b"WRIT" in fail)
+    assert device.flash[0x8000:0x8000 + len(data)] == data
+    image = bytes(device.flash[0x8000:0x8000 + 0x5200])
+    assert device.sealed[2] == struct.pack("<I", zlib.crc32(image))
+
+def test_flash_uart(monkeypatch, tmp_path):
+    device = FakeBootloader()
+    data, _ = _flash(monkeypatch, tmp_path, device, vid=None)
+
+    assert device.flash[0x8000:0x8000 + len(data)] == data
+    # Nothing can be queued up behind a WRIT on a hardware UART
+    assert device.max_in_flight == 1
+
+@pytest.mark.parametrize("fail", [{}, {b"READ": [3]}, {b"CRCC": [2]}])
+def test_read(monkeypatch, tmp_path, fail):
+    device = FakeBootloader(fail=fail)
+    _install(monkeypatch, device)
+    data = os.urandom(0x2345)
+    device.flash[0x8000:0x8000 + len(data)] = data
+    file = tmp_path / "out.bin"
+
+    result = CliRunner().invoke(cli.app, [
+        "read", "-o", str(file), "-a", hex(ERASE_START), "-l", hex(len(data))])
+
+    assert result.exit_code == 0, result.output
+    assert file.read_bytes() == data
+    assert ("Retrying" in result.output) == bool(fail)
+
+def test_sync_picks_first_port_that_answers(monkeypatch, capsys):
+    device = FakeBootloader()
+    release = threading.Event()
+
+    def serial(port, baudrate, timeout, write_timeout):
+        if port == "ttyS0":
+            # Slow to open, shouldn't hold up the port that did answer
+            release.wait(5)
+            raise SerialException("could not open port")
+        if port == "ttyS1":
+            raise SerialException("could not open port")
+        return FakeSerial(device, port, timeout)
+
+    monkeypatch.setattr(cli, "Serial", serial)
+    monkeypatch.setattr(cli, "comports", lambda: [
+        FakePort("ttyS0"), FakePort("ttyS1"), FakePort("ttyACM0")])
+
+    try:
+        assert cli.sync() == "ttyACM0"
+    finally:
+        release.set()
+    # Neither losing port prints anything
+    assert "Failed to connect" not in capsys.readouterr().out
@@ -0,0 +1,23 @@
+import pytest
+
+from rp2040_flashtool.type_hints import parse_integer
+
+@pytest.mark.parametrize("value, expected", [
+    ("0x10000000", 0x10000000),
+    ("0X1f", 0x1f),
+    ("0o17", 0o17),
+    ("0b101", 0b101),
+    ("4096", 4096),
+    ("010", 10),
+    ("0", 0),
+])
+def test_parse_integer(value, expected):
+    assert parse_integer(value) == expected
+
+def test_parse_integer_passthrough():
+    assert parse_integer(0x1000) == 0x1000
+
+@pytest.mark.parametrize("value", ["ff", "1000a", "0xzz", ""])
+def test_parse_integer_rejects(value):
+    with pytest.raises(ValueError, match="is not a number"):
+        parse_integer(value)
@@ -0,0 +1,143 @@
+import os
+import struct
+
+import pytest
+
+from rp2040_flashtool.util import BlInfo, load_elf, load_file
+
+bl_info = BlInfo(
+    flash_start=0x10000000,
+    flash_size=0x200000,
+    erase_start=0x10008000,
+    erase_size=0x1000,
+    write_size=0x100,
+    max_data_len=0x400,
+)
+
+info_bytes = struct.pack(
+    "<6I", 0x10000000, 0x200000, 0x10008000, 0x1000, 0x100, 0x400)
+
+def test_bl_info_from_bytes():
+    assert BlInfo.from_bytes(info_bytes) == bl_info
+
+@pytest.mark.parametrize("data", [info_bytes[:23], info_bytes + b"\0"])
+def test_bl_info_from_bytes_bad_length(data):
+    with pytest.raises(ValueError):
+        BlInfo.from_bytes(data)
+
+def test_bl_info_repr():
+    assert repr(bl_info) == (
+        "Flash start:     0x10000000\n"
+        "Flash size:      0x200000\n"
+        "Erase start:     0x10008000\n"
+        "Erase size:      0x1000\n"
+        "Write size:      0x100\n"
+        "Max data length: 0x400\n"
+    )
+
+def test_load_bin_pads_last_chunk(tmp_path):
+    # Not a multiple of write_size or max_data_len
+    data = os.urandom(0x9123)
+    file = tmp_path / "image.bin"
+    file.write_bytes(data)
+
+    addr, length, chunks = load_file(file, bl_info, 0x10008000)
+    chunks = list(chunks)
+
+    assert addr == 0x10008000
+    assert length == 0x9200
+    assert [offset for offset, _ in chunks] == list(range(0, 0x9200, 0x400))
+    assert [len(c) for _, c in chunks] == [0x400] * 36 + [0x200]
+    image = b"".join(bytes(c) for _, c in chunks)
+    assert image[:len(data)] == data
+    assert image[len(data):] == bytes(0x9200 - len(data))
+
+def test_load_bin_aligned(tmp_path):
+    data = os.urandom(0x800)
+    file = tmp_path / "image.bin"
+    file.write_bytes(data)
+
+    addr, length, chunks = load_file(file, bl_info, 0x10008000)
+    chunks = list(chunks)
+
+    assert length == 0x800
+    assert chunks == [(0, data[:0x400]), (0x400, data[0x400:])]
+
+def _build_elf(path):
+    """Write a small ARM ELF laid out like a typical RP2040 image:
+    .text/.rodata in flash, .data loaded from flash but linked in RAM,
+    .bss in RAM, and a non allocated .comment section.
+
+    The .data program header comes first, so the image has to be
+    assembled out of program header order.
+    """
+    text = os.urandom(0x100)
+    rodata = os.urandom(0x20)
+    data = os.urandom(0x40)
+    comment = b"GCC: (test) 1.0\0"
+    shstrtab = b"\0.text\0.rodata\0.data\0.bss\0.comment\0.shstrtab\0"
+
+    def name(n):
+        return shstrtab.index(n + b"\0")
+
+    text_off, rodata_off, data_off = 0x100, 0x200, 0x220
+    comment_off = 0x260
+    shstrtab_off = comment_off + len(comment)
+    shoff = (shstrtab_off + len(shstrtab) + 3) & ~3
+
+    phdrs = [
+        # type, offset, vaddr, paddr, filesz, memsz, flags, align
+        (1, data_off, 0x20000000, 0x10000130, 0x40, 0x40, 6, 4),
+        (1, text_off, 0x10000000, 0x10000000, 0x130, 0x130, 5, 4),
+        (1, 0, 0x20000040, 0x20000040, 0, 0x20, 6, 4),
+    ]
+    shdrs = [
+        # name, type, flags, addr, offset, size, link, info, align, entsize
+        (0, 0, 0, 0, 0, 0, 0, 0, 0, 0),
+        (name(b".text"), 1, 6, 0x10000000, text_off, 0x100, 0, 0, 4, 0),
+        (name(b".rodata"), 1, 2, 0x10000110, rodata_off, 0x20, 0, 0, 4, 0),
+        (name(b".data"), 1, 3, 0x20000000, data_off, 0x40, 0, 0, 4, 0),
+        (name(b".bss"), 8, 3, 0x20000040, data_off + 0x40, 0x20, 0, 0, 4, 0),
+        (name(b".comment"), 1, 0x30, 0, comment_off, len(comment), 0, 0, 1, 1),
+        (name(b".shstrtab"), 3, 0, 0, shstrtab_off, len(shstrtab), 0, 0, 1, 0),
+    ]
+
+    img = bytearray(shoff + 40 * len(shdrs))
+    struct.pack_into(
+        "<16sHHIIIIIHHHHHH", img, 0,
+        b"\x7fELF\x01\x01\x01", 2, 40, 1, 0x10000001, 52, shoff, 0x5000000,
+        52, 32, len(phdrs), 40, len(shdrs), len(shdrs) - 1)
+    for idx, phdr in enumerate(phdrs):
+        struct.pack_into("<8I", img, 52 + 32 * idx, *phdr)
+    for idx, shdr in enumerate(shdrs):
+        struct.pack_into("<10I", img, shoff + 40 * idx, *shdr)
+    img[text_off:text_off + len(text)] = text
+    img[rodata_off:rodata_off + len(rodata)] = rodata
+    img[data_off:data_off + len(data)] = data
+    img[comment_off:comment_off + len(comment)] = comment
+    img[shstrtab_off:shstrtab_off + len(shstrtab)] = shstrtab
+    path.write_bytes(img)
+    # .rodata is 0x10 bytes past the end of .text, .data is loaded right
+    # after .rodata
+    return text + bytes(0x10) + rodata + data
+
+def test_load_elf(tmp_path):
+    file = tmp_path / "image.elf"
+    expected = _build_elf(file)
+
+    addr, data = load_elf(file, bl_info)
+
+    assert addr == 0x10000000
+    assert bytes(data) == expected
+
+def test_load_file_elf(tmp_path):
+    file = tmp_path / "image.elf"
+    expected = _build_elf(file)
+
+    addr, length, chunks = load_file(file, bl_info)
+    chunks = list(chunks)
+
+    assert addr == 0x10000000
+    assert length == 0x200
+    assert [offset for offset, _ in chunks] == [0]
+    assert bytes(chunks[0][1]) == expected + bytes(0x200 - len(expected))